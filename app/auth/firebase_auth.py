@@ -4,61 +4,107 @@ Handles user authentication with password hashing
 """
 
 import hashlib
-import secrets
+import hmac
+import string
 import streamlit as st
 from typing import Optional, Dict
-from database.db import Database
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from database.db import Database, get_db
+
+# Argon2id parameters (OWASP recommended: 46 MiB, t=3, p=1)
+_PH = PasswordHasher(time_cost=3, memory_cost=46 * 1024, parallelism=1, hash_len=32)
+
+# Checked against when an email is unknown, so sign-in takes the same time
+# whether or not the account exists
+_DUMMY_HASH = _PH.hash("dummy-password")
+
+# Allowed characters for each side of an email address
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + '._%+-')
+_EMAIL_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + '.-')
+_EMAIL_TLD_CHARS = frozenset(string.ascii_letters)
 
 class SimpleAuth:
-    def __init__(self):
-        """Initialize authentication"""
-        self.db = Database()
+    def __init__(self, db: Database = None):
+        """Initialize authentication (uses the shared Database unless one is given)"""
+        self.db = db if db is not None else get_db()
     
     @staticmethod
-    def hash_password(password: str, salt: str = None) -> tuple:
+    def hash_password(password: str) -> str:
         """
-        Hash password with salt
+        Hash password with Argon2id
         
         Args:
             password: Plain text password
-            salt: Optional salt (generates new if not provided)
             
         Returns:
-            Tuple of (hashed_password, salt)
+            Encoded Argon2id hash (parameters and salt included)
         """
-        if salt is None:
-            salt = secrets.token_hex(32)
-        
-        pwd_hash = hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode('utf-8'),
-            salt.encode('utf-8'),
-            100000
-        )
-        return pwd_hash.hex(), salt
+        return _PH.hash(password)
     
     @staticmethod
-    def verify_password(password: str, hashed_password: str, salt: str) -> bool:
+    def verify_password(password: str, hashed_password: str, salt: str = None) -> bool:
         """
         Verify password against hash
         
         Args:
             password: Plain text password
             hashed_password: Stored hash
-            salt: Stored salt
+            salt: Stored salt (only set for legacy PBKDF2 hashes)
             
         Returns:
             True if password matches
         """
-        pwd_hash, _ = SimpleAuth.hash_password(password, salt)
-        return pwd_hash == hashed_password
+        if salt:
+            return SimpleAuth._verify_legacy_password(password, hashed_password, salt)
+        try:
+            return _PH.verify(hashed_password, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    
+    @staticmethod
+    def _verify_legacy_password(password: str, hashed_password: str, salt: str) -> bool:
+        """Verify a PBKDF2-SHA256 hash created before the Argon2id migration"""
+        pwd_hash = hashlib.pbkdf2_hmac(
+            'sha256',
+            password.encode('utf-8'),
+            salt.encode('utf-8'),
+            100000
+        ).hex()
+        return hmac.compare_digest(pwd_hash, hashed_password)
+    
+    @staticmethod
+    def needs_rehash(hashed_password: str, salt: str = None) -> bool:
+        """Check whether a stored hash should be upgraded to current parameters"""
+        if salt:
+            return True
+        try:
+            return _PH.check_needs_rehash(hashed_password)
+        except InvalidHashError:
+            return True
     
     @staticmethod
     def validate_email(email: str) -> bool:
-        """Basic email validation"""
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        """
+        Basic email validation
+        
+        Single linear pass over each part, so it cannot backtrack on
+        crafted input the way an equivalent regex can.
+        """
+        at = email.rfind('@')
+        if at < 1:
+            return False
+        dot = email.rfind('.', at)
+        # Need at least one domain character before the final dot
+        if dot < at + 2:
+            return False
+        tld = email[dot + 1:]
+        return (
+            len(tld) >= 2
+            and all(c in _EMAIL_TLD_CHARS for c in tld)
+            and all(c in _EMAIL_LOCAL_CHARS for c in email[:at])
+            and all(c in _EMAIL_DOMAIN_CHARS for c in email[at + 1:dot])
+        )
     
     def sign_up(self, email: str, password: str, display_name: str = None) -> Dict:
         """
@@ -87,10 +133,10 @@ class SimpleAuth:
                 return {"success": False, "error": "Email already exists"}
             
             # Hash password
-            pwd_hash, salt = self.hash_password(password)
+            pwd_hash = self.hash_password(password)
             
             # Create user
-            user_id = self.db.create_user_with_password(email, pwd_hash, salt, display_name)
+            user_id = self.db.create_user_with_password(email, pwd_hash, display_name)
             
             if user_id:
                 user = self.db.get_user_by_id(user_id)
@@ -122,12 +168,21 @@ class SimpleAuth:
             user = self.db.get_user_by_email(email)
             
             if not user:
+                self.verify_password(password, _DUMMY_HASH)
                 return {"success": False, "error": "Invalid email or password"}
             
             # Verify password
             if not self.verify_password(password, user['password_hash'], user['salt']):
                 return {"success": False, "error": "Invalid email or password"}
             
+            # Upgrade legacy or outdated hashes now that we have the plain password
+            if self.needs_rehash(user['password_hash'], user['salt']):
+                self.db.update_user_password(user['id'], self.hash_password(password))
+            
+            # Keep credentials out of the session
+            user.pop('password_hash')
+            user.pop('salt')
+            
             return {
                 "success": True,
                 "user": user,
@@ -168,8 +223,12 @@ class SimpleAuth:
             Success or error message
         """
         try:
+            # Validate new password before any database or hashing work
+            if len(new_password) < 6:
+                return {"success": False, "error": "New password should be at least 6 characters"}
+            
             # Get user
-            user = self.db.get_user_by_id(user_id)
+            user = self.db.get_user_credentials(user_id)
             if not user:
                 return {"success": False, "error": "User not found"}
             
@@ -177,18 +236,19 @@ class SimpleAuth:
             if not self.verify_password(old_password, user['password_hash'], user['salt']):
                 return {"success": False, "error": "Current password is incorrect"}
             
-            # Validate new password
-            if len(new_password) < 6:
-                return {"success": False, "error": "New password should be at least 6 characters"}
-            
             # Hash new password
-            pwd_hash, salt = self.hash_password(new_password)
+            pwd_hash = self.hash_password(new_password)
             
             # Update password
-            if self.db.update_user_password(user_id, pwd_hash, salt):
+            if self.db.update_user_password(user_id, pwd_hash):
                 return {"success": True, "message": "Password changed successfully"}
             else:
                 return {"success": False, "error": "Failed to update password"}
                 
         except Exception as e:
             return {"success": False, "error": str(e)}
+
+@st.cache_resource
+def get_auth() -> SimpleAuth:
+    """Process-wide SimpleAuth instance shared across reruns and sessions"""
+    return SimpleAuth()
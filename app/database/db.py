@@ -3,11 +3,104 @@ Database connection and management
 """
 
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import threading
+import weakref
+import streamlit as st
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from contextlib import contextmanager
 from typing import Optional, List, Dict, Any
 
+POOL_MIN_CONNECTIONS = 1
+POOL_MAX_CONNECTIONS = 16
+
+# Characters of generated_text returned by content listings
+CONTENT_PREVIEW_LENGTH = 500
+
+# Prompts longer than this are truncated (plus "...") in prompt_preview
+PROMPT_PREVIEW_LENGTH = 100
+
+# Columns returned by generated content listings (full text via get_content_body)
+CONTENT_COLUMNS = f"""
+    gc.id, gc.session_id, gc.content_type_id, gc.prompt,
+    LEFT(gc.generated_text, {CONTENT_PREVIEW_LENGTH}) AS generated_preview,
+    LENGTH(gc.generated_text) AS full_len, gc.tone, gc.length_preference, gc.created_at, gc.is_favorite,
+    gc.prompt_preview, gc.word_count, ct.name as content_type_name
+"""
+
+# Hot read queries, prepared once per pooled connection ($n placeholders)
+PREPARED_STATEMENTS = {
+    "get_user_content": f"""
+        SELECT {CONTENT_COLUMNS}
+        FROM generated_content gc
+        LEFT JOIN content_types ct ON gc.content_type_id = ct.id
+        WHERE gc.user_id = $1
+        ORDER BY gc.created_at DESC
+        LIMIT $2
+    """,
+    "get_chat_messages": """
+        SELECT id, role, content, created_at
+        FROM chat_messages
+        WHERE session_id = $1
+        ORDER BY created_at ASC, id ASC
+    """,
+    "get_recent_chat_messages": """
+        SELECT id, role, content, created_at, COUNT(*) OVER () AS total
+        FROM chat_messages
+        WHERE session_id = $1
+        ORDER BY created_at DESC, id DESC
+        LIMIT $2
+    """,
+}
+
+# Whitelisted ORDER BY clauses for generated content listings
+CONTENT_SORT_ORDERS = {
+    "recent": "gc.created_at DESC",
+    "oldest": "gc.created_at ASC",
+    "favorites": "gc.is_favorite DESC, gc.created_at DESC",
+}
+
+# Connection pools are process-wide so they survive Streamlit reruns
+_pools: Dict[str, ThreadedConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+# Names of statements already prepared on each live connection
+_prepared: "weakref.WeakKeyDictionary[Any, set]" = weakref.WeakKeyDictionary()
+
+def _get_pool(dsn: str) -> ThreadedConnectionPool:
+    """Return the shared connection pool for a DSN, creating it on first use"""
+    pool = _pools.get(dsn)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(dsn)
+            if pool is None:
+                pool = ThreadedConnectionPool(POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS, dsn=dsn)
+                _pools[dsn] = pool
+    return pool
+
+INSERT_GENERATED_CONTENT = """
+    INSERT INTO generated_content 
+    (user_id, session_id, content_type_id, prompt, generated_text, tone, length_preference,
+     prompt_preview, word_count)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    RETURNING id
+"""
+
+def _generated_content_params(user_id, session_id, content_type_id, prompt,
+                              generated_text, tone, length_preference) -> tuple:
+    """Build INSERT_GENERATED_CONTENT parameters, including preview and word count"""
+    if len(prompt) > PROMPT_PREVIEW_LENGTH:
+        prompt_preview = prompt[:PROMPT_PREVIEW_LENGTH] + "..."
+    else:
+        prompt_preview = prompt
+    word_count = len(generated_text.split())
+    return (user_id, session_id, content_type_id, prompt, generated_text, tone,
+            length_preference, prompt_preview, word_count)
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 class Database:
     def __init__(self):
         """Initialize database connection parameters"""
@@ -18,16 +111,19 @@ class Database:
     
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = psycopg2.connect(self.connection_string)
+        """Context manager for pooled database connections"""
+        pool = _get_pool(self.connection_string)
+        conn = pool.getconn()
         try:
             yield conn
             conn.commit()
         except Exception as e:
-            conn.rollback()
+            if not conn.closed:
+                conn.rollback()
             raise e
         finally:
-            conn.close()
+            # Drop broken connections instead of handing them out again
+            pool.putconn(conn, close=bool(conn.closed))
     
     def execute_query(self, query: str, params: tuple = None) -> Optional[List[Dict]]:
         """
@@ -45,12 +141,36 @@ class Database:
                 cursor.execute(query, params)
                 return cursor.fetchall()
     
+    def execute_prepared(self, name: str, params: tuple) -> Optional[List[Dict]]:
+        """
+        Execute a statement from PREPARED_STATEMENTS and return results
+        
+        The statement is prepared on first use per connection, so later
+        calls skip parsing and planning on the server.
+        
+        Args:
+            name: Key in PREPARED_STATEMENTS
+            params: Query parameters
+            
+        Returns:
+            List of dictionaries with query results
+        """
+        with self.get_connection() as conn:
+            prepared = _prepared.setdefault(conn, set())
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                if name not in prepared:
+                    cursor.execute(f"PREPARE {name} AS {PREPARED_STATEMENTS[name]}")
+                    prepared.add(name)
+                placeholders = ", ".join(["%s"] * len(params))
+                cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+                return cursor.fetchall()
+    
     def execute_insert(self, query: str, params: tuple = None) -> Optional[int]:
         """
-        Execute an INSERT query and return the inserted ID
+        Execute an INSERT ... RETURNING id query and return the inserted ID
         
         Args:
-            query: SQL query string
+            query: SQL query string (must end with RETURNING id)
             params: Query parameters
             
         Returns:
@@ -59,10 +179,8 @@ class Database:
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(query, params)
-                if cursor.rowcount > 0:
-                    cursor.execute("SELECT lastval()")
-                    return cursor.fetchone()[0]
-                return None
+                row = cursor.fetchone()
+                return row[0] if row else None
     
     def execute_update(self, query: str, params: tuple = None) -> int:
         """
@@ -81,25 +199,36 @@ class Database:
                 return cursor.rowcount
     
     # User operations
-    def create_user_with_password(self, email: str, password_hash: str, salt: str, display_name: str = None) -> Optional[int]:
+    def create_user_with_password(self, email: str, password_hash: str, display_name: str = None) -> Optional[int]:
         """Create a new user with password"""
         query = """
-            INSERT INTO users (email, password_hash, salt, display_name)
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO users (email, password_hash, display_name)
+            VALUES (%s, %s, %s)
             RETURNING id
         """
-        result = self.execute_query(query, (email, password_hash, salt, display_name))
-        return result[0]['id'] if result else None
+        return self.execute_insert(query, (email, password_hash, display_name))
     
     def get_user_by_email(self, email: str) -> Optional[Dict]:
-        """Get user by email"""
-        query = "SELECT * FROM users WHERE email = %s"
+        """Get user by email, including credentials for sign-in"""
+        query = """
+            SELECT id, email, password_hash, salt, display_name
+            FROM users WHERE email = %s
+        """
         result = self.execute_query(query, (email,))
         return dict(result[0]) if result else None
     
     def get_user_by_id(self, user_id: int) -> Optional[Dict]:
-        """Get user by ID"""
-        query = "SELECT * FROM users WHERE id = %s"
+        """Get user profile by ID (without credentials)"""
+        query = """
+            SELECT id, email, display_name, profile_picture_url, created_at
+            FROM users WHERE id = %s
+        """
+        result = self.execute_query(query, (user_id,))
+        return dict(result[0]) if result else None
+    
+    def get_user_credentials(self, user_id: int) -> Optional[Dict]:
+        """Get stored password hash and legacy salt for a user"""
+        query = "SELECT id, password_hash, salt FROM users WHERE id = %s"
         result = self.execute_query(query, (user_id,))
         return dict(result[0]) if result else None
     
@@ -114,19 +243,19 @@ class Database:
         """
         return self.execute_update(query, (display_name, profile_picture_url, user_id)) > 0
     
-    def update_user_password(self, user_id: int, password_hash: str, salt: str) -> bool:
-        """Update user password"""
+    def update_user_password(self, user_id: int, password_hash: str) -> bool:
+        """Update user password (clears the legacy PBKDF2 salt)"""
         query = """
             UPDATE users 
-            SET password_hash = %s, salt = %s
+            SET password_hash = %s, salt = NULL
             WHERE id = %s
         """
-        return self.execute_update(query, (password_hash, salt, user_id)) > 0
+        return self.execute_update(query, (password_hash, user_id)) > 0
     
     # Content type operations
     def get_all_content_types(self) -> List[Dict]:
         """Get all available content types"""
-        query = "SELECT * FROM content_types ORDER BY name"
+        query = "SELECT id, name, description FROM content_types ORDER BY name"
         result = self.execute_query(query)
         return [dict(row) for row in result] if result else []
     
@@ -138,13 +267,13 @@ class Database:
             VALUES (%s, %s, %s)
             RETURNING id
         """
-        result = self.execute_query(query, (user_id, title, content_type_id))
-        return result[0]['id'] if result else None
+        return self.execute_insert(query, (user_id, title, content_type_id))
     
     def get_user_chat_sessions(self, user_id: int, limit: int = 50) -> List[Dict]:
         """Get all chat sessions for a user"""
         query = """
-            SELECT cs.*, ct.name as content_type_name
+            SELECT cs.id, cs.title, cs.content_type_id, cs.created_at, cs.updated_at,
+                   ct.name as content_type_name
             FROM chat_sessions cs
             LEFT JOIN content_types ct ON cs.content_type_id = ct.id
             WHERE cs.user_id = %s
@@ -157,7 +286,8 @@ class Database:
     def get_chat_session(self, session_id: int) -> Optional[Dict]:
         """Get a specific chat session"""
         query = """
-            SELECT cs.*, ct.name as content_type_name
+            SELECT cs.id, cs.user_id, cs.title, cs.content_type_id, cs.created_at, cs.updated_at,
+                   ct.name as content_type_name
             FROM chat_sessions cs
             LEFT JOIN content_types ct ON cs.content_type_id = ct.id
             WHERE cs.id = %s
@@ -178,45 +308,219 @@ class Database:
             VALUES (%s, %s, %s)
             RETURNING id
         """
-        result = self.execute_query(query, (session_id, role, content))
-        return result[0]['id'] if result else None
+        return self.execute_insert(query, (session_id, role, content))
+    
+    def add_chat_messages(self, session_id: int, messages: List[tuple]) -> int:
+        """Add several (role, content) messages to a chat session in one statement"""
+        if not messages:
+            return 0
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    "INSERT INTO chat_messages (session_id, role, content) VALUES %s",
+                    [(session_id, role, content) for role, content in messages]
+                )
+                return cursor.rowcount
     
     def get_chat_messages(self, session_id: int) -> List[Dict]:
         """Get all messages in a chat session"""
-        query = """
-            SELECT * FROM chat_messages
-            WHERE session_id = %s
-            ORDER BY created_at ASC
-        """
-        result = self.execute_query(query, (session_id,))
+        result = self.execute_prepared("get_chat_messages", (session_id,))
         return [dict(row) for row in result] if result else []
     
+    def get_recent_chat_messages(self, session_id: int, limit: int) -> tuple:
+        """
+        Get the most recent messages in a chat session
+        
+        Args:
+            session_id: Chat session ID
+            limit: Maximum number of messages
+            
+        Returns:
+            Tuple of (messages oldest first, total messages in the session)
+        """
+        result = self.execute_prepared("get_recent_chat_messages", (session_id, limit))
+        if not result:
+            return [], 0
+        return [dict(row) for row in reversed(result)], result[0]['total']
+    
     # Generated content operations
     def save_generated_content(self, user_id: int, session_id: int, content_type_id: int,
                                prompt: str, generated_text: str, tone: str = None,
                                length_preference: str = None) -> Optional[int]:
-        """Save generated content"""
+        """Save generated content along with its precomputed preview and word count"""
+        return self.execute_insert(INSERT_GENERATED_CONTENT, _generated_content_params(
+            user_id, session_id, content_type_id, prompt, generated_text, tone, length_preference
+        ))
+    
+    def finalize_turn(self, user_id: int, session_id: Optional[int], content_type_id: int,
+                      prompt: str, generated_text: str, tone: str = None,
+                      length_preference: str = None, title: str = None) -> int:
+        """
+        Save a completed generation in a single transaction
+        
+        Creates the chat session if needed, then stores the user and
+        assistant messages and the generated content.
+        
+        Args:
+            user_id: User ID
+            session_id: Existing chat session ID, or None to create one
+            content_type_id: Content type ID
+            prompt: User prompt
+            generated_text: Generated content
+            tone: Tone used
+            length_preference: Length used
+            title: Title for a newly created session
+            
+        Returns:
+            Chat session ID
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                if session_id is None:
+                    cursor.execute(
+                        """
+                        INSERT INTO chat_sessions (user_id, title, content_type_id)
+                        VALUES (%s, %s, %s)
+                        RETURNING id
+                        """,
+                        (user_id, title, content_type_id)
+                    )
+                    session_id = cursor.fetchone()[0]
+                
+                execute_values(
+                    cursor,
+                    "INSERT INTO chat_messages (session_id, role, content) VALUES %s",
+                    [(session_id, 'user', prompt), (session_id, 'assistant', generated_text)]
+                )
+                cursor.execute(INSERT_GENERATED_CONTENT, _generated_content_params(
+                    user_id, session_id, content_type_id, prompt, generated_text, tone, length_preference
+                ))
+        return session_id
+    
+    def get_user_generated_content(self, user_id: int, limit: int = 50, search: str = None,
+                                   content_type: str = None, sort: str = "recent") -> List[Dict]:
+        """
+        Get generated content for a user
+        
+        Args:
+            user_id: User ID
+            limit: Maximum number of rows
+            search: Optional case-insensitive substring of prompt or text
+            content_type: Optional content type name to filter on
+            sort: One of "recent", "oldest" or "favorites"
+            
+        Returns:
+            List of content dictionaries
+        """
+        # The default view uses the prepared statement
+        if not search and not content_type and sort == "recent":
+            result = self.execute_prepared("get_user_content", (user_id, limit))
+            return [dict(row) for row in result] if result else []
+        
+        conditions = ["gc.user_id = %s"]
+        params = [user_id]
+        
+        if search:
+            pattern = f"%{_escape_like(search)}%"
+            conditions.append("(gc.prompt ILIKE %s OR gc.generated_text ILIKE %s)")
+            params.extend([pattern, pattern])
+        
+        if content_type:
+            conditions.append("ct.name = %s")
+            params.append(content_type)
+        
+        where_clause = " AND ".join(conditions)
+        order_by = CONTENT_SORT_ORDERS.get(sort, CONTENT_SORT_ORDERS["recent"])
+        params.append(limit)
+        
+        query = f"""
+            SELECT {CONTENT_COLUMNS}
+            FROM generated_content gc
+            LEFT JOIN content_types ct ON gc.content_type_id = ct.id
+            WHERE {where_clause}
+            ORDER BY {order_by}
+            LIMIT %s
+        """
+        result = self.execute_query(query, tuple(params))
+        return [dict(row) for row in result] if result else []
+    
+    def get_content_body(self, content_id: int) -> Optional[str]:
+        """Get the full generated text of a content item"""
+        query = "SELECT generated_text FROM generated_content WHERE id = %s"
+        result = self.execute_query(query, (content_id,))
+        return result[0]['generated_text'] if result else None
+    
+    def get_user_content_stats(self, user_id: int) -> Dict:
+        """Get total, favorite count and latest timestamp of a user's content"""
         query = """
-            INSERT INTO generated_content 
-            (user_id, session_id, content_type_id, prompt, generated_text, tone, length_preference)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
+            SELECT COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE is_favorite) AS favorites,
+                   MAX(created_at) AS latest
+            FROM generated_content
+            WHERE user_id = %s
         """
-        result = self.execute_query(query, (user_id, session_id, content_type_id, 
-                                           prompt, generated_text, tone, length_preference))
-        return result[0]['id'] if result else None
+        result = self.execute_query(query, (user_id,))
+        return dict(result[0]) if result else {"total": 0, "favorites": 0, "latest": None}
     
-    def get_user_generated_content(self, user_id: int, limit: int = 50) -> List[Dict]:
-        """Get all generated content for a user"""
+    def get_user_counts(self, user_id: int) -> Dict:
+        """Get the number of generated content items and chat sessions for a user"""
         query = """
-            SELECT gc.*, ct.name as content_type_name
+            SELECT (SELECT COUNT(*) FROM generated_content WHERE user_id = %s) AS content_count,
+                   (SELECT COUNT(*) FROM chat_sessions WHERE user_id = %s) AS session_count
+        """
+        result = self.execute_query(query, (user_id, user_id))
+        return dict(result[0])
+    
+    def get_user_stats(self, user_id: int) -> Dict:
+        """
+        Get aggregate statistics for a user's content and sessions
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Dictionary with total, favorites, total_words, session_count,
+            top_tone, top_length and by_type (content type name -> count,
+            most used first)
+        """
+        totals_query = """
+            SELECT COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE is_favorite) AS favorites,
+                   COALESCE(SUM(word_count), 0) AS total_words,
+                   MODE() WITHIN GROUP (ORDER BY tone) AS top_tone,
+                   MODE() WITHIN GROUP (ORDER BY length_preference) AS top_length,
+                   (SELECT COUNT(*) FROM chat_sessions WHERE user_id = %s) AS session_count
+            FROM generated_content
+            WHERE user_id = %s
+        """
+        by_type_query = """
+            SELECT ct.name AS content_type_name, COUNT(*) AS count
             FROM generated_content gc
             LEFT JOIN content_types ct ON gc.content_type_id = ct.id
             WHERE gc.user_id = %s
-            ORDER BY gc.created_at DESC
+            GROUP BY ct.name
+            ORDER BY count DESC
+        """
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(totals_query, (user_id, user_id))
+                stats = dict(cursor.fetchone())
+                cursor.execute(by_type_query, (user_id,))
+                stats['by_type'] = {row['content_type_name']: row['count'] for row in cursor.fetchall()}
+        return stats
+    
+    def get_user_activity_by_day(self, user_id: int, days: int = 7) -> List[Dict]:
+        """Get content counts for the user's most recent active days (newest first)"""
+        query = """
+            SELECT created_at::date AS day, COUNT(*) AS count
+            FROM generated_content
+            WHERE user_id = %s
+            GROUP BY day
+            ORDER BY day DESC
             LIMIT %s
         """
-        result = self.execute_query(query, (user_id, limit))
+        result = self.execute_query(query, (user_id, days))
         return [dict(row) for row in result] if result else []
     
     def toggle_favorite(self, content_id: int) -> bool:
@@ -231,7 +535,10 @@ class Database:
     # User preferences operations
     def get_user_preferences(self, user_id: int) -> Optional[Dict]:
         """Get user preferences"""
-        query = "SELECT * FROM user_preferences WHERE user_id = %s"
+        query = """
+            SELECT default_tone, default_length, theme
+            FROM user_preferences WHERE user_id = %s
+        """
         result = self.execute_query(query, (user_id,))
         return dict(result[0]) if result else None
     
@@ -248,3 +555,19 @@ class Database:
                 updated_at = CURRENT_TIMESTAMP
         """
         return self.execute_update(query, (user_id, default_tone, default_length, theme)) > 0
+
+@st.cache_resource
+def get_db() -> Database:
+    """Process-wide Database instance shared across reruns and sessions"""
+    return Database()
+
+@st.cache_data(ttl=3600)
+def load_content_types():
+    """
+    Cached content types (static reference data)
+    
+    Returns:
+        Tuple of (content type list, name -> id dict)
+    """
+    content_types = get_db().get_all_content_types()
+    return content_types, {ct['name']: ct['id'] for ct in content_types}
@@ -15,16 +15,8 @@ from pages._login import show_login_page
 from pages._home import show_home_page
 from pages._history import show_history_page
 from pages._profile import show_profile_page
-from auth.firebase_auth import SimpleAuth
-from utils.ui_helpers import set_page_config, apply_custom_css
-
-# Configure page - set to wide mode and custom title
-st.set_page_config(
-    page_title="AI Content Creator",
-    page_icon="🎨",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+from auth.firebase_auth import get_auth
+from utils.ui_helpers import bootstrap_ui
 
 def initialize_session_state():
     """Initialize session state variables"""
@@ -68,7 +60,7 @@ def show_navigation():
         
         # Logout button
         if st.button("🚪 Logout", use_container_width=True, type="secondary"):
-            auth = SimpleAuth()
+            auth = get_auth()
             auth.sign_out()
             st.session_state.clear()
             st.rerun()
@@ -90,11 +82,11 @@ def show_navigation():
 
 def main():
     """Main application logic"""
+    bootstrap_ui()
     initialize_session_state()
-    apply_custom_css()
     
     # Check authentication
-    auth = SimpleAuth()
+    auth = get_auth()
     
     if not auth.is_authenticated():
         # Show login page
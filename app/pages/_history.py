@@ -2,17 +2,52 @@
 History Page - View past generated content
 """
 
+import time
 import streamlit as st
-from database.db import Database
-from utils.ui_helpers import apply_custom_css, show_header
+from database.db import get_db, load_content_types, CONTENT_PREVIEW_LENGTH
+from utils.ui_helpers import bootstrap_ui, show_header
 from datetime import datetime
 
+# Sort labels mapped to Database.get_user_generated_content sort keys
+SORT_OPTIONS = {
+    "Recent First": "recent",
+    "Oldest First": "oldest",
+    "Favorites": "favorites",
+}
+
+# The version argument only keys the cache; bump st.session_state.content_version
+# whenever the user's content changes so the next rerun refetches. The cache is
+# shared by every session, so bump to time.time_ns() (not += 1) to get a key
+# no other tab of the same user can have cached already.
+@st.cache_data(ttl=60, show_spinner=False)
+def _user_content(user_id, version, search=None, content_type=None, sort="recent"):
+    """Cached history listing for a user"""
+    return get_db().get_user_generated_content(
+        user_id, limit=100, search=search, content_type=content_type, sort=sort
+    )
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _user_content_stats(user_id, version):
+    """Cached history stats for a user"""
+    return get_db().get_user_content_stats(user_id)
+
+def _content_body(content):
+    """Full generated text if available, otherwise None until loaded on demand"""
+    if content['full_len'] <= CONTENT_PREVIEW_LENGTH:
+        return content['generated_preview']
+    return st.session_state.get(f"body_{content['id']}")
+
+def _load_content_body(content_id):
+    """Fetch a content body into the session so later reruns reuse it"""
+    st.session_state[f"body_{content_id}"] = get_db().get_content_body(content_id)
+
 def show_history_page():
     """Display history page with generated content"""
-    apply_custom_css()
     show_header("📜 Content History", "View and manage your generated content")
     
-    db = Database()
+    db = get_db()
+    if 'content_version' not in st.session_state:
+        st.session_state.content_version = 0
     
     # Filters
     col1, col2, col3 = st.columns([2, 1, 1])
@@ -21,7 +56,7 @@ def show_history_page():
         search_query = st.text_input("🔍 Search", placeholder="Search in your content...")
     
     with col2:
-        content_types = db.get_all_content_types()
+        content_types, _ = load_content_types()
         filter_type = st.selectbox(
             "Filter by Type",
             ["All"] + [ct['name'] for ct in content_types]
@@ -30,44 +65,33 @@ def show_history_page():
     with col3:
         sort_by = st.selectbox(
             "Sort by",
-            ["Recent First", "Oldest First", "Favorites"]
+            list(SORT_OPTIONS)
         )
     
     st.markdown("---")
     
-    # Get generated content
-    generated_content = db.get_user_generated_content(st.session_state.user_id, limit=100)
-    
-    # Apply filters
-    if filter_type != "All":
-        generated_content = [gc for gc in generated_content if gc['content_type_name'] == filter_type]
-    
-    if search_query:
-        search_lower = search_query.lower()
-        generated_content = [
-            gc for gc in generated_content 
-            if search_lower in gc['prompt'].lower() or search_lower in gc['generated_text'].lower()
-        ]
-    
-    # Apply sorting
-    if sort_by == "Oldest First":
-        generated_content = sorted(generated_content, key=lambda x: x['created_at'])
-    elif sort_by == "Favorites":
-        generated_content = sorted(generated_content, key=lambda x: x['is_favorite'], reverse=True)
+    # Get generated content (filtered and sorted in the database) and overall stats
+    generated_content = _user_content(
+        st.session_state.user_id,
+        st.session_state.content_version,
+        search=search_query or None,
+        content_type=None if filter_type == "All" else filter_type,
+        sort=SORT_OPTIONS[sort_by]
+    )
+    stats = _user_content_stats(st.session_state.user_id, st.session_state.content_version)
     
     # Display stats
     col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
     
     with col_stat1:
-        st.metric("Total Content", len(db.get_user_generated_content(st.session_state.user_id, limit=1000)))
+        st.metric("Total Content", stats['total'])
     
     with col_stat2:
-        favorites_count = len([gc for gc in db.get_user_generated_content(st.session_state.user_id, limit=1000) if gc['is_favorite']])
-        st.metric("Favorites", favorites_count)
+        st.metric("Favorites", stats['favorites'])
     
     with col_stat3:
-        if generated_content:
-            latest = datetime.fromisoformat(str(generated_content[0]['created_at']))
+        if stats['latest']:
+            latest = stats['latest']
             days_ago = (datetime.now() - latest).days
             st.metric("Last Created", f"{days_ago} days ago" if days_ago > 0 else "Today")
     
@@ -79,6 +103,8 @@ def show_history_page():
     # Display content
     if generated_content:
         for idx, content in enumerate(generated_content):
+            body = _content_body(content)
+            
             with st.container():
                 col_main, col_actions = st.columns([5, 1])
                 
@@ -88,9 +114,9 @@ def show_history_page():
                         <div class="history-card">
                             <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
                                 <span class="content-badge">{content['content_type_name']}</span>
-                                <span class="timestamp">{datetime.fromisoformat(str(content['created_at'])).strftime('%b %d, %Y %I:%M %p')}</span>
+                                <span class="timestamp">{content['created_at'].strftime('%b %d, %Y %I:%M %p')}</span>
                             </div>
-                            <h4 style="margin: 0.5rem 0;">{'⭐ ' if content['is_favorite'] else ''}{content['prompt'][:100]}{'...' if len(content['prompt']) > 100 else ''}</h4>
+                            <h4 style="margin: 0.5rem 0;">{'⭐ ' if content['is_favorite'] else ''}{content['prompt_preview']}</h4>
                         </div>
                     """, unsafe_allow_html=True)
                     
@@ -100,16 +126,19 @@ def show_history_page():
                         st.info(content['prompt'])
                         
                         st.markdown(f"**Generated Content:**")
-                        st.success(content['generated_text'])
+                        if body is not None:
+                            st.success(body)
+                        else:
+                            st.success(content['generated_preview'] + "...")
+                            st.button("Show full content", key=f"load_{content['id']}",
+                                      on_click=_load_content_body, args=(content['id'],))
                         
                         # Metadata
-                        col_meta1, col_meta2, col_meta3 = st.columns(3)
-                        with col_meta1:
-                            st.caption(f"**Tone:** {content['tone'] or 'N/A'}")
-                        with col_meta2:
-                            st.caption(f"**Length:** {content['length_preference'] or 'N/A'}")
-                        with col_meta3:
-                            st.caption(f"**Words:** {len(content['generated_text'].split())}")
+                        st.caption(
+                            f"**Tone:** {content['tone'] or 'N/A'} · "
+                            f"**Length:** {content['length_preference'] or 'N/A'} · "
+                            f"**Words:** {content['word_count']}"
+                        )
                 
                 with col_actions:
                     st.markdown("<br>", unsafe_allow_html=True)
@@ -120,17 +149,24 @@ def show_history_page():
                                help="Toggle favorite",
                                use_container_width=True):
                         db.toggle_favorite(content['id'])
+                        st.session_state.content_version = time.time_ns()
                         st.rerun()
                     
-                    # Copy button
-                    st.download_button(
-                        "📋",
-                        content['generated_text'],
-                        file_name=f"content_{content['id']}.txt",
-                        key=f"copy_{content['id']}",
-                        help="Download content",
-                        use_container_width=True
-                    )
+                    # Copy button (long content is fetched on first click)
+                    if body is not None:
+                        st.download_button(
+                            "📋",
+                            body,
+                            file_name=f"content_{content['id']}.txt",
+                            key=f"copy_{content['id']}",
+                            help="Download content",
+                            use_container_width=True
+                        )
+                    else:
+                        st.button("📋", key=f"prepare_{content['id']}",
+                                  help="Load content for download",
+                                  on_click=_load_content_body, args=(content['id'],),
+                                  use_container_width=True)
                     
                     # Continue chat button
                     if content['session_id']:
@@ -139,10 +175,9 @@ def show_history_page():
                                    help="Continue this chat",
                                    use_container_width=True):
                             st.session_state.current_session_id = content['session_id']
+                            st.session_state.content_version = time.time_ns()
                             st.session_state.page = 'home'
                             st.rerun()
-                
-                st.markdown("<br>", unsafe_allow_html=True)
     else:
         st.info("📭 No content found. Start creating some amazing content!")
         if st.button("➕ Create Content", type="primary"):
@@ -154,4 +189,5 @@ def show_history_page():
         st.info("💡 Showing recent 100 items. Use filters to narrow down results.")
 
 if __name__ == "__main__":
+    bootstrap_ui()
     show_history_page()
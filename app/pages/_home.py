@@ -2,19 +2,60 @@
 Home Page - Content Generation Interface
 """
 
+import html
+import time
 import streamlit as st
-from database.db import Database
-from services.ollama_service import OllamaService
-from utils.ui_helpers import apply_custom_css, show_header, show_error, show_success
+from database.db import get_db, load_content_types
+from services.ollama_service import get_ollama
+from utils.ui_helpers import bootstrap_ui, show_header, show_error, show_success
 from datetime import datetime
 
+# Number of most recent chat messages shown when continuing a session
+HISTORY_WINDOW = 20
+
+# Redraw the streaming output at most every 50 ms or 256 new characters
+STREAM_FLUSH_SECONDS = 0.05
+STREAM_FLUSH_CHARS = 256
+
+# Chat history bubbles, filled with already-escaped message text
+MESSAGE_HTML = {
+    'user': '<div class="user-message"><b>You:</b><br>{}</div>',
+    'assistant': '<div class="assistant-message"><b>AI:</b><br>{}</div>'
+}
+
+EXAMPLE_PROMPTS = [
+    "Write about AI trends in 2026",
+    "Create an email for product launch",
+    "Draft a LinkedIn post about teamwork",
+    "Generate ad copy for eco-friendly products"
+]
+
+# The version argument only keys the cache (see st.session_state.content_version).
+# The cache is shared by every session, so new versions come from time.time_ns()
+# rather than a per-session counter that another tab could already have used.
+@st.cache_data(ttl=30, show_spinner=False)
+def home_sidebar_data(user_id, version):
+    """Recent sessions and content/session counts for the home page"""
+    db = get_db()
+    data = db.get_user_counts(user_id)
+    data['sessions'] = db.get_user_chat_sessions(user_id, limit=10)
+    return data
+
+def _set_prompt(prompt):
+    """Fill the prompt box; runs as a callback, before the text_area is created"""
+    st.session_state.user_prompt = prompt
+
+def _prepare_download():
+    """Show the download button for the last generated content"""
+    st.session_state.last_generated_ready = True
+
 def show_home_page():
     """Display home page with content generation"""
-    apply_custom_css()
     show_header("🎨 Create Content", "Generate amazing content with AI")
     
-    db = Database()
-    ollama = OllamaService()
+    db = get_db()
+    ollama = get_ollama()
+    home_data = home_sidebar_data(st.session_state.user_id, st.session_state.get('content_version', 0))
     
     # Check Groq API connection
     if not ollama.check_connection():
@@ -26,7 +67,7 @@ def show_home_page():
         st.markdown("### ⚙️ Content Settings")
         
         # Get content types
-        content_types = db.get_all_content_types()
+        content_types, content_type_ids = load_content_types()
         content_type_names = [ct['name'] for ct in content_types]
         
         selected_content_type = st.selectbox(
@@ -51,7 +92,7 @@ def show_home_page():
         
         # Chat sessions
         st.markdown("### 💬 Recent Chats")
-        user_sessions = db.get_user_chat_sessions(st.session_state.user_id, limit=10)
+        user_sessions = home_data['sessions']
         
         if user_sessions:
             for session in user_sessions:
@@ -77,14 +118,22 @@ def show_home_page():
                 st.info(f"📝 Continuing: {session['title']}")
                 
                 # Display chat history
-                messages = db.get_chat_messages(st.session_state.current_session_id)
+                messages, total_messages = db.get_recent_chat_messages(
+                    st.session_state.current_session_id, HISTORY_WINDOW
+                )
                 
                 st.markdown("### Chat History")
-                for msg in messages:
-                    if msg['role'] == 'user':
-                        st.markdown(f'<div class="user-message"><b>You:</b><br>{msg["content"]}</div>', unsafe_allow_html=True)
-                    else:
-                        st.markdown(f'<div class="assistant-message"><b>AI:</b><br>{msg["content"]}</div>', unsafe_allow_html=True)
+                hidden = total_messages - len(messages)
+                if hidden:
+                    st.caption(f"… {hidden} earlier messages not shown")
+                # One markdown element for the whole window; newlines become <br> so
+                # blank lines in a message can't end the HTML block early
+                st.markdown(''.join(
+                    MESSAGE_HTML['user' if msg['role'] == 'user' else 'assistant'].format(
+                        html.escape(msg['content']).replace('\n', '<br>')
+                    )
+                    for msg in messages
+                ), unsafe_allow_html=True)
                 
                 st.markdown("---")
         
@@ -113,26 +162,7 @@ def show_home_page():
             with st.spinner("🎨 Generating content..."):
                 try:
                     # Get content type ID
-                    content_type_id = next(
-                        (ct['id'] for ct in content_types if ct['name'] == selected_content_type),
-                        None
-                    )
-                    
-                    # Create or get session
-                    if 'current_session_id' not in st.session_state:
-                        # Create new session
-                        title = user_prompt[:50] + "..." if len(user_prompt) > 50 else user_prompt
-                        session_id = db.create_chat_session(
-                            st.session_state.user_id,
-                            title,
-                            content_type_id
-                        )
-                        st.session_state.current_session_id = session_id
-                    else:
-                        session_id = st.session_state.current_session_id
-                    
-                    # Save user message
-                    db.add_chat_message(session_id, 'user', user_prompt)
+                    content_type_id = content_type_ids.get(selected_content_type)
                     
                     # Create optimized prompt
                     system_prompt = ollama.create_content_prompt(
@@ -146,50 +176,71 @@ def show_home_page():
                     st.markdown("### ✨ Generated Content")
                     generated_text = ""
                     placeholder = st.empty()
+                    last_flush = 0.0
+                    flushed_len = 0
                     
                     for chunk in ollama.generate_content_stream(system_prompt):
                         generated_text += chunk
-                        placeholder.markdown(f'<div class="assistant-message">{generated_text}</div>', unsafe_allow_html=True)
+                        now = time.monotonic()
+                        if now - last_flush > STREAM_FLUSH_SECONDS or len(generated_text) - flushed_len > STREAM_FLUSH_CHARS:
+                            placeholder.markdown(f'<div class="assistant-message">{generated_text}</div>', unsafe_allow_html=True)
+                            last_flush = now
+                            flushed_len = len(generated_text)
                     
-                    # Save assistant message
-                    db.add_chat_message(session_id, 'assistant', generated_text)
+                    # Final redraw with whatever arrived since the last flush
+                    placeholder.markdown(f'<div class="assistant-message">{generated_text}</div>', unsafe_allow_html=True)
                     
-                    # Save generated content
-                    db.save_generated_content(
+                    # Save the session (if new), both messages and the content in one transaction
+                    title = user_prompt[:50] + "..." if len(user_prompt) > 50 else user_prompt
+                    st.session_state.current_session_id = db.finalize_turn(
                         st.session_state.user_id,
-                        session_id,
+                        st.session_state.get('current_session_id'),
                         content_type_id,
                         user_prompt,
                         generated_text,
                         tone.lower(),
-                        length.lower()
+                        length.lower(),
+                        title=title
                     )
+                    # Invalidate the cached history listing and sidebar data
+                    st.session_state.content_version = time.time_ns()
                     
                     show_success("Content generated successfully!")
                     
-                    # Copy button
-                    st.download_button(
-                        "📋 Copy to Clipboard",
-                        generated_text,
-                        file_name=f"{selected_content_type.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-                        use_container_width=True
-                    )
+                    # Keep the text for the download button below; it is only
+                    # sent to the browser once the user asks for it
+                    st.session_state.last_generated = generated_text
+                    st.session_state.last_generated_name = f"{selected_content_type.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+                    st.session_state.last_generated_ready = False
+                    st.session_state.last_generated_session = st.session_state.current_session_id
                     
                 except Exception as e:
                     show_error(f"Error generating content: {str(e)}")
         
         elif generate_btn:
             show_error("Please enter a prompt")
+        
+        # Copy button for the most recent generation, only while its chat is open
+        # (New Chat, Clear Chat or picking another session hides it)
+        if ('last_generated' in st.session_state
+                and st.session_state.get('last_generated_session') == st.session_state.get('current_session_id')):
+            if st.session_state.get('last_generated_ready'):
+                st.download_button(
+                    "📋 Copy to Clipboard",
+                    st.session_state.last_generated,
+                    file_name=st.session_state.last_generated_name,
+                    use_container_width=True
+                )
+            else:
+                st.button("📋 Prepare download", on_click=_prepare_download, use_container_width=True)
     
     with col2:
         st.markdown("### 📊 Quick Stats")
         
-        # Get user stats
-        generated_content = db.get_user_generated_content(st.session_state.user_id, limit=100)
-        sessions = db.get_user_chat_sessions(st.session_state.user_id, limit=100)
-        
-        st.metric("Total Content", len(generated_content))
-        st.metric("Chat Sessions", len(sessions))
+        # Re-read so counts include content generated earlier in this run
+        home_data = home_sidebar_data(st.session_state.user_id, st.session_state.get('content_version', 0))
+        st.metric("Total Content", home_data['content_count'])
+        st.metric("Chat Sessions", home_data['session_count'])
         
         st.markdown("---")
         
@@ -203,17 +254,9 @@ def show_home_page():
         """)
         
         st.markdown("### 🎯 Example Prompts")
-        examples = [
-            "Write about AI trends in 2026",
-            "Create an email for product launch",
-            "Draft a LinkedIn post about teamwork",
-            "Generate ad copy for eco-friendly products"
-        ]
-        
-        for example in examples:
-            if st.button(example, key=f"example_{example[:20]}", use_container_width=True):
-                st.session_state.user_prompt = example
-                st.rerun()
+        example = st.selectbox("Example prompt", EXAMPLE_PROMPTS, label_visibility="collapsed")
+        st.button("Use example", key="use_example", on_click=_set_prompt, args=(example,), use_container_width=True)
 
 if __name__ == "__main__":
+    bootstrap_ui()
     show_home_page()
@@ -2,15 +2,72 @@
 Login Page
 """
 
+import hashlib
+import itertools
+import threading
+import time
 import streamlit as st
-from auth.firebase_auth import SimpleAuth
-from database.db import Database
-from utils.ui_helpers import apply_custom_css, show_error, show_success
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from auth.firebase_auth import get_auth
+from utils.ui_helpers import bootstrap_ui, show_error, show_success
+
+# Leaky buckets: bursts of up to CAPACITY attempts, refilled at REFILL_PER_SECOND.
+# Per-email and per-session buckets slow down a single target or browser tab.
+# The global bucket doesn't depend on anything the client chooses, so rotating
+# emails or opening new sessions can't keep the password hasher busy; it is
+# sized from the hashing budget (an Argon2id verify is ~50 ms, so 20/s is about
+# one core) and sits far above this app's peak login rate, so it only trips
+# under a flood rather than locking out ordinary users.
+LOGIN_BUCKET_CAPACITY = 5
+LOGIN_REFILL_PER_SECOND = 1.0
+LOGIN_GLOBAL_CAPACITY = 100
+LOGIN_GLOBAL_REFILL_PER_SECOND = 20.0
+# Fully refilled buckets carry no state; sweep them out every this many calls
+LOGIN_PRUNE_EVERY = 256
+RATE_LIMIT_MESSAGE = "Too many attempts, try again shortly"
+
+@st.cache_resource
+def _login_buckets():
+    """Attempt buckets shared across sessions: key -> (last_ts, tokens), plus lock and call counter"""
+    return {}, threading.Lock(), itertools.count(1)
+
+def _allow_attempt(email: str) -> bool:
+    """Take one token from each applicable bucket, only if all have one"""
+    buckets, lock, calls = _login_buckets()
+    limits = {
+        ("email", hashlib.sha256(email.strip().lower().encode()).hexdigest()):
+            (LOGIN_BUCKET_CAPACITY, LOGIN_REFILL_PER_SECOND),
+        ("global",): (LOGIN_GLOBAL_CAPACITY, LOGIN_GLOBAL_REFILL_PER_SECOND)
+    }
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        limits[("session", ctx.session_id)] = (LOGIN_BUCKET_CAPACITY, LOGIN_REFILL_PER_SECOND)
+    now = time.monotonic()
+    
+    with lock:
+        if next(calls) % LOGIN_PRUNE_EVERY == 0:
+            idle = max(LOGIN_BUCKET_CAPACITY / LOGIN_REFILL_PER_SECOND,
+                       LOGIN_GLOBAL_CAPACITY / LOGIN_GLOBAL_REFILL_PER_SECOND)
+            for stale in [k for k, (ts, _) in buckets.items() if now - ts >= idle]:
+                del buckets[stale]
+        
+        refilled = {}
+        for key, (capacity, rate) in limits.items():
+            last_ts, tokens = buckets.get(key, (now, capacity))
+            refilled[key] = min(capacity, tokens + (now - last_ts) * rate)
+        
+        allowed = all(tokens >= 1 for tokens in refilled.values())
+        for key, tokens in refilled.items():
+            if allowed:
+                buckets[key] = (now, tokens - 1)
+            elif key in buckets:
+                # Denied attempts never add keys, so the table only grows at
+                # the (globally capped) rate of allowed attempts
+                buckets[key] = (now, tokens)
+        return allowed
 
 def show_login_page():
     """Display login page"""
-    apply_custom_css()
-    
     # Center the login form
     col1, col2, col3 = st.columns([1, 2, 1])
     
@@ -36,9 +93,13 @@ def show_login_page():
                     forgot_password = st.form_submit_button("Forgot Password?", use_container_width=True)
                 
                 if submit_login:
-                    if email and password:
+                    if not (email and password):
+                        show_error("Please enter both email and password")
+                    elif not _allow_attempt(email):
+                        show_error(RATE_LIMIT_MESSAGE)
+                    else:
                         with st.spinner("Logging in..."):
-                            auth = SimpleAuth()
+                            auth = get_auth()
                             result = auth.sign_in(email, password)
                             
                             if result["success"]:
@@ -51,8 +112,6 @@ def show_login_page():
                                 st.rerun()
                             else:
                                 show_error(result["error"])
-                    else:
-                        show_error("Please enter both email and password")
                 
                 if forgot_password:
                     show_error("Password reset feature: Please contact administrator or use 'Change Password' in profile after logging in.")
@@ -74,9 +133,11 @@ def show_login_page():
                             show_error("Passwords do not match")
                         elif len(new_password) < 6:
                             show_error("Password should be at least 6 characters")
+                        elif not _allow_attempt(new_email):
+                            show_error(RATE_LIMIT_MESSAGE)
                         else:
                             with st.spinner("Creating account..."):
-                                auth = SimpleAuth()
+                                auth = get_auth()
                                 result = auth.sign_up(new_email, new_password, display_name)
                                 
                                 if result["success"]:
@@ -96,4 +157,5 @@ def show_login_page():
         st.markdown("<p style='text-align: center; color: #999; font-size: 0.85rem;'>By continuing, you agree to our Terms of Service and Privacy Policy</p>", unsafe_allow_html=True)
 
 if __name__ == "__main__":
+    bootstrap_ui()
     show_login_page()
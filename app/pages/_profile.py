@@ -2,18 +2,33 @@
 Profile Page - User profile and settings
 """
 
+import pandas as pd
 import streamlit as st
-from database.db import Database
-from auth.firebase_auth import SimpleAuth
-from utils.ui_helpers import apply_custom_css, show_success, show_error
-from datetime import datetime
+from database.db import get_db
+from auth.firebase_auth import get_auth
+from utils.ui_helpers import bootstrap_ui, show_success, show_error
+
+TONES = ("professional", "casual", "creative", "persuasive", "informative")
+LENGTHS = ("short", "medium", "long")
+THEMES = ("light", "dark")
+TONE_IX = {tone: i for i, tone in enumerate(TONES)}
+LENGTH_IX = {length: i for i, length in enumerate(LENGTHS)}
+THEME_IX = {theme: i for i, theme in enumerate(THEMES)}
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _user_profile(user_id):
+    """Cached profile row for a user"""
+    return get_db().get_user_by_id(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _user_preferences(user_id):
+    """Cached content preferences for a user"""
+    return get_db().get_user_preferences(user_id)
 
 def show_profile_page():
     """Display profile page"""
-    apply_custom_css()
-    
-    db = Database()
-    user = db.get_user_by_id(st.session_state.user_id)
+    db = get_db()
+    user = _user_profile(st.session_state.user_id)
     
     if not user:
         show_error("User not found")
@@ -25,15 +40,21 @@ def show_profile_page():
             <div style="font-size: 4rem;">👤</div>
             <h2 style="margin: 0.5rem 0;">{user['display_name'] or 'User'}</h2>
             <p style="margin: 0;">{user['email']}</p>
-            <p style="margin: 0.5rem 0; opacity: 0.8;">Member since {datetime.fromisoformat(str(user['created_at'])).strftime('%B %Y')}</p>
+            <p style="margin: 0.5rem 0; opacity: 0.8;">Member since {user['created_at'].strftime('%B %Y')}</p>
         </div>
     """, unsafe_allow_html=True)
     
-    # Tabs
-    tab1, tab2, tab3 = st.tabs(["📝 Profile Info", "⚙️ Preferences", "📊 Statistics"])
+    # Sections (only the selected one runs, unlike st.tabs)
+    tab = st.radio(
+        "Profile section",
+        ["📝 Profile Info", "⚙️ Preferences", "📊 Statistics"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="profile_active_tab"
+    )
     
     # Profile Info Tab
-    with tab1:
+    if tab == "📝 Profile Info":
         st.markdown("### Edit Profile")
         
         with st.form("profile_form"):
@@ -64,6 +85,7 @@ def show_profile_page():
             
             if submit_profile:
                 if db.update_user_profile(st.session_state.user_id, display_name, profile_picture_url):
+                    _user_profile.clear()
                     show_success("Profile updated successfully!")
                     st.rerun()
                 else:
@@ -85,7 +107,7 @@ def show_profile_page():
                 elif new_password != confirm_new_password:
                     show_error("New passwords do not match")
                 else:
-                    auth = SimpleAuth()
+                    auth = get_auth()
                     result = auth.change_password(st.session_state.user_id, old_password, new_password)
                     if result['success']:
                         show_success(result['message'])
@@ -93,35 +115,29 @@ def show_profile_page():
                         show_error(result['error'])
     
     # Preferences Tab
-    with tab2:
+    elif tab == "⚙️ Preferences":
         st.markdown("### Content Preferences")
         
         # Get current preferences
-        prefs = db.get_user_preferences(st.session_state.user_id)
+        prefs = _user_preferences(st.session_state.user_id)
         
         with st.form("preferences_form"):
             default_tone = st.selectbox(
                 "Default Tone",
-                ["professional", "casual", "creative", "persuasive", "informative"],
-                index=["professional", "casual", "creative", "persuasive", "informative"].index(
-                    prefs['default_tone'] if prefs else 'professional'
-                )
+                TONES,
+                index=TONE_IX.get(prefs['default_tone'] if prefs else 'professional', 0)
             )
             
             default_length = st.selectbox(
                 "Default Length",
-                ["short", "medium", "long"],
-                index=["short", "medium", "long"].index(
-                    prefs['default_length'] if prefs else 'medium'
-                )
+                LENGTHS,
+                index=LENGTH_IX.get(prefs['default_length'] if prefs else 'medium', 0)
             )
             
             theme = st.selectbox(
                 "Theme",
-                ["light", "dark"],
-                index=["light", "dark"].index(
-                    prefs['theme'] if prefs else 'light'
-                ),
+                THEMES,
+                index=THEME_IX.get(prefs['theme'] if prefs else 'light', 0),
                 help="Theme preference (currently visual only)"
             )
             
@@ -134,6 +150,7 @@ def show_profile_page():
                     default_length,
                     theme
                 ):
+                    _user_preferences.clear()
                     show_success("Preferences saved successfully!")
                     st.rerun()
                 else:
@@ -146,7 +163,7 @@ def show_profile_page():
         
         with col1:
             if st.button("🚪 Logout", use_container_width=True, type="secondary", key="profile_logout_btn"):
-                auth = SimpleAuth()
+                auth = get_auth()
                 auth.sign_out()
                 st.session_state.clear()
                 st.rerun()
@@ -156,37 +173,33 @@ def show_profile_page():
                 st.warning("⚠️ Account deletion is not yet implemented. Contact support.")
     
     # Statistics Tab
-    with tab3:
+    elif tab == "📊 Statistics":
         st.markdown("### Your Statistics")
         
-        # Get statistics
-        generated_content = db.get_user_generated_content(st.session_state.user_id, limit=1000)
-        sessions = db.get_user_chat_sessions(st.session_state.user_id, limit=1000)
-        content_types = db.get_all_content_types()
+        # Get statistics (aggregated in the database)
+        stats = db.get_user_stats(st.session_state.user_id)
         
         # Overall stats
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Total Content", len(generated_content))
+            st.metric("Total Content", stats['total'])
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col2:
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Chat Sessions", len(sessions))
+            st.metric("Chat Sessions", stats['session_count'])
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col3:
-            favorites = len([gc for gc in generated_content if gc['is_favorite']])
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Favorites", favorites)
+            st.metric("Favorites", stats['favorites'])
             st.markdown('</div>', unsafe_allow_html=True)
         
         with col4:
-            total_words = sum(len(gc['generated_text'].split()) for gc in generated_content)
             st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-            st.metric("Total Words", f"{total_words:,}")
+            st.metric("Total Words", f"{stats['total_words']:,}")
             st.markdown('</div>', unsafe_allow_html=True)
         
         st.markdown("<br>", unsafe_allow_html=True)
@@ -197,33 +210,24 @@ def show_profile_page():
         with col1:
             st.markdown("### 📊 Content by Type")
             
-            type_counts = {}
-            for gc in generated_content:
-                ct_name = gc['content_type_name']
-                type_counts[ct_name] = type_counts.get(ct_name, 0) + 1
+            type_counts = stats['by_type']
             
             if type_counts:
-                for ct_name, count in sorted(type_counts.items(), key=lambda x: x[1], reverse=True):
-                    st.progress(count / len(generated_content), text=f"{ct_name}: {count}")
+                st.bar_chart(pd.Series(type_counts, name="Content"))
             else:
                 st.info("No content generated yet")
         
         with col2:
             st.markdown("### 📈 Recent Activity")
             
-            if generated_content:
-                # Group by date
-                from collections import defaultdict
-                date_counts = defaultdict(int)
-                
-                for gc in generated_content[:30]:  # Last 30 items
-                    date = datetime.fromisoformat(str(gc['created_at'])).strftime('%Y-%m-%d')
-                    date_counts[date] += 1
-                
-                # Display recent dates
-                for date, count in sorted(date_counts.items(), reverse=True)[:7]:
-                    formatted_date = datetime.strptime(date, '%Y-%m-%d').strftime('%b %d')
-                    st.write(f"**{formatted_date}**: {count} content created")
+            activity = db.get_user_activity_by_day(st.session_state.user_id, days=7)
+            if activity:
+                # Chart the 7 most recent active dates (grouped in the database)
+                st.bar_chart(pd.Series(
+                    [row['count'] for row in activity],
+                    index=pd.to_datetime([row['day'] for row in activity]),
+                    name="Content created"
+                ))
             else:
                 st.info("No activity yet")
         
@@ -236,21 +240,18 @@ def show_profile_page():
         
         with col1:
             st.markdown("**Most Used Tone:**")
-            tones = [gc['tone'] for gc in generated_content if gc['tone']]
-            if tones:
-                most_common_tone = max(set(tones), key=tones.count)
-                st.info(f"📝 {most_common_tone.title()}")
+            if stats['top_tone']:
+                st.info(f"📝 {stats['top_tone'].title()}")
             else:
                 st.info("No data yet")
         
         with col2:
             st.markdown("**Most Used Length:**")
-            lengths = [gc['length_preference'] for gc in generated_content if gc['length_preference']]
-            if lengths:
-                most_common_length = max(set(lengths), key=lengths.count)
-                st.info(f"📏 {most_common_length.title()}")
+            if stats['top_length']:
+                st.info(f"📏 {stats['top_length'].title()}")
             else:
                 st.info("No data yet")
 
 if __name__ == "__main__":
+    bootstrap_ui()
     show_profile_page()
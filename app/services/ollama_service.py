@@ -4,9 +4,191 @@ Handles communication with Groq for content generation
 """
 
 import os
+import asyncio
+import threading
+import time
+import aiohttp
+import orjson
 import requests
-from typing import Dict, List, Optional, Generator
-import json
+import streamlit as st
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as UrllibHTTPError
+from urllib3.util.retry import Retry
+from typing import AsyncGenerator, Dict, List, Optional, Generator
+
+# One service instance is shared by every Streamlit session (see get_ollama),
+# so the pool must hold enough connections for concurrent generations
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 32
+
+# Longest Retry-After honoured between attempts. Generations run on the
+# Streamlit script thread, so a long server-requested wait would hang the page.
+RETRY_AFTER_MAX = 5
+
+class _CappedRetry(Retry):
+    """Retry that never sleeps longer than RETRY_AFTER_MAX for a Retry-After"""
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, RETRY_AFTER_MAX)
+
+# Rate limits (429) and transient 5xx are retried with exponential backoff,
+# honouring Groq's Retry-After (capped). Read errors are not retried: the
+# request may already have been processed (and billed).
+_RETRY = _CappedRetry(
+    total=3,
+    read=0,
+    status_forcelist=[429, 500, 502, 503, 504],
+    backoff_factor=0.5,
+    respect_retry_after_header=True,
+    allowed_methods=["POST"],
+    raise_on_status=False
+)
+
+# Upper bound on bytes pulled from the socket per read while streaming
+SSE_READ_SIZE = 8192
+
+# Seconds a successful check_connection is trusted before probing again
+CONNECTION_CHECK_TTL = 60
+
+# Returned by list_models when /models can't be reached
+_FALLBACK_MODELS = [
+    "llama-3.3-70b-versatile",
+    "mixtral-8x7b-32768",
+    "gemma2-9b-it"
+]
+
+# Non-streaming responses remembered per (model, system prompt, prompt)
+RESPONSE_CACHE_SIZE = 256
+
+# Streamed tokens are yielded in batches: after this many milliseconds by
+# default, or once this many tokens are waiting
+STREAM_COALESCE_MS = 30.0
+STREAM_COALESCE_TOKENS = 16
+
+# SSE framing, compared against raw bytes lines
+_SSE_PREFIX = b'data: '
+_SSE_DONE = b'[DONE]'
+
+_LENGTH_GUIDELINES = {
+    "short": "Keep it concise, around 50-100 words.",
+    "medium": "Make it moderate length, around 150-250 words.",
+    "long": "Create detailed content, around 300-500 words."
+}
+
+_TONE_GUIDELINES = {
+    "professional": "Use professional, formal language.",
+    "casual": "Use casual, friendly language.",
+    "creative": "Be creative and engaging.",
+    "persuasive": "Be persuasive and compelling.",
+    "informative": "Be informative and educational."
+}
+
+# Content type -> (template, fallback tone, fallback length); the fallbacks
+# apply when tone/length is not one of the guideline keys above
+_PROMPT_TEMPLATES = {
+    "LinkedIn Post": ("""Create a professional LinkedIn post about: {user_prompt}
+
+Requirements:
+- {tone}
+- {length}
+- Include relevant hashtags
+- Make it engaging and valuable for LinkedIn audience
+- Use appropriate formatting with line breaks
+
+Generate only the post content, no explanations.""", "professional", "medium"),
+    
+    "Professional Email": ("""Write a professional email about: {user_prompt}
+
+Requirements:
+- {tone}
+- Include appropriate subject line
+- Proper email structure (greeting, body, closing)
+- {length}
+- Clear and concise communication
+
+Generate only the email content.""", "professional", "medium"),
+    
+    "Ad Content": ("""Create compelling ad copy for: {user_prompt}
+
+Requirements:
+- {tone}
+- {length}
+- Include attention-grabbing headline
+- Focus on benefits and call-to-action
+- Persuasive and engaging
+
+Generate only the ad content.""", "persuasive", "short"),
+    
+    "Conversational Text": ("""Generate conversational text about: {user_prompt}
+
+Requirements:
+- {tone}
+- {length}
+- Natural, flowing conversation style
+- Engaging and relatable
+
+Generate only the conversational text.""", "casual", "medium"),
+    
+    "Blog Post": ("""Write a blog post about: {user_prompt}
+
+Requirements:
+- {tone}
+- {length}
+- Include engaging title
+- Well-structured with introduction, body, conclusion
+- Informative and valuable content
+
+Generate only the blog post.""", "informative", "long"),
+    
+    "Social Media Caption": ("""Create a social media caption for: {user_prompt}
+
+Requirements:
+- {tone}
+- {length}
+- Engaging and shareable
+- Include relevant hashtags and emojis
+- Platform-appropriate
+
+Generate only the caption.""", "casual", "short")
+}
+
+def _extract_content(data: Dict) -> str:
+    """Reply text of a non-streaming chat completion"""
+    return data['choices'][0]['message']['content']
+
+def _extract_delta_content(data: Dict) -> Optional[str]:
+    """New text carried by one streamed chat completion chunk, if any"""
+    return (data['choices'][0]['delta'] or {}).get('content')
+
+def _iter_sse_lines(response, chunk_size: int = SSE_READ_SIZE) -> Generator:
+    """
+    Split a streamed response body into lines (bytes, without line endings)
+    
+    Reads straight from the urllib3 response, which hands over each chunk as it
+    arrives, and keeps an offset into one buffer instead of re-slicing the
+    unread tail for every line. The consumed prefix is dropped once it is more
+    than half the buffer.
+    """
+    buf = bytearray()
+    pos = 0
+    for chunk in response.raw.stream(chunk_size, decode_content=True):
+        buf += chunk
+        nl = buf.find(b'\n', pos)
+        while nl >= 0:
+            end = nl - 1 if nl > pos and buf[nl - 1] == 13 else nl  # drop \r
+            yield buf[pos:end]
+            pos = nl + 1
+            nl = buf.find(b'\n', pos)
+        if pos > len(buf) // 2:
+            del buf[:pos]
+            pos = 0
+    if pos < len(buf):
+        yield buf[pos:]
 
 class OllamaService:
     def __init__(self):
@@ -15,41 +197,71 @@ class OllamaService:
         self.base_url = "https://api.groq.com/openai/v1"
         self.model = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
         self.api_chat = f"{self.base_url}/chat/completions"
-        self.headers = {
+        self.api_models = f"{self.base_url}/models"
+        # Reused across calls so requests keep TCP/TLS connections alive.
+        # Headers are set once here instead of being passed per request; bodies
+        # are pre-serialized with orjson, so Content-Type must stay here too
+        self.session = requests.Session()
+        self.session.headers.update({
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
-        }
+        })
+        # Only chat completions retry; check_connection runs on home page reruns
+        # and must fail fast instead of sleeping through Retry-After
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE
+        ))
+        self.session.mount(self.api_chat, HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=_RETRY
+        ))
+        # LRU of generate_content results; the lock is needed because the
+        # instance is shared by every session's script thread
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._connection_ok_at = None
+        self._models_cache = None
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
     
     def check_connection(self) -> bool:
         """Check if Groq API key is valid"""
         if not self.api_key:
             return False
+        # Pages call this on every rerun; only re-probe once the last success is stale
+        now = time.monotonic()
+        if self._connection_ok_at is not None and now - self._connection_ok_at < CONNECTION_CHECK_TTL:
+            return True
         try:
-            response = requests.post(
-                self.api_chat,
-                headers=self.headers,
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": "test"}],
-                    "max_tokens": 5
-                },
-                timeout=10
-            )
-            return response.status_code == 200
-        except:
+            # Listing models verifies the key without spending tokens
+            response = self.session.get(self.api_models, timeout=5)
+            if response.status_code == 200:
+                self._connection_ok_at = now
+                return True
+            return False
+        except requests.RequestException:
             return False
     
     def list_models(self) -> List[str]:
-        """List available models in Groq"""
-        return [
-            "llama-3.3-70b-versatile",
-            "llama-3.1-70b-versatile",
-            "mixtral-8x7b-32768",
-            "gemma2-9b-it"
-        ]
+        """List available models in Groq (fetched once, then memoized)"""
+        if self._models_cache:
+            return self._models_cache
+        try:
+            response = self.session.get(self.api_models, timeout=5)
+            if response.status_code == 200:
+                self._models_cache = [model["id"] for model in orjson.loads(response.content)["data"]]
+                return self._models_cache
+        except Exception as e:
+            print(f"Error listing models: {e}")
+        # Not memoized, so a later call can still pick up the live list
+        return list(_FALLBACK_MODELS)
     
     def generate_content(self, prompt: str, system_prompt: str = None, 
-                        stream: bool = False) -> Optional[str]:
+                        stream: bool = False, cache: bool = False) -> Optional[str]:
         """
         Generate content using Groq API
         
@@ -57,10 +269,91 @@ class OllamaService:
             prompt: User prompt
             system_prompt: System instructions
             stream: Whether to stream the response
+            cache: Reuse an earlier response to the same prompt (ignored when streaming).
+                Off by default: requests use Groq's default temperature, so a
+                repeated prompt would otherwise not get a new generation
+            
+        Returns:
+            Generated text or None if error
+        """
+        key = (self.model, system_prompt or "", prompt) if cache and not stream else None
+        if key is not None:
+            with self._cache_lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    return self._cache[key]
+        
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        text = self._post_chat(messages, stream)
+        if key is not None and text is not None:
+            with self._cache_lock:
+                self._cache[key] = text
+                if len(self._cache) > RESPONSE_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return text
+    
+    def batch_generate(self, items: List[Dict[str, str]], max_concurrency: int = 8) -> List[Optional[str]]:
+        """
+        Generate several prompts concurrently on the pooled session
+        
+        Args:
+            items: Dicts with 'prompt' and optional 'system_prompt'
+            max_concurrency: Maximum requests in flight
+            
+        Returns:
+            Generated texts (None for failures), in the order of items
+        """
+        if not items:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as executor:
+            futures = [
+                executor.submit(self.generate_content, item["prompt"], item.get("system_prompt"))
+                for item in items
+            ]
+            return [future.result() for future in futures]
+    
+    def generate_content_stream(self, prompt: str, system_prompt: str = None,
+                                coalesce_ms: float = STREAM_COALESCE_MS) -> Generator:
+        """
+        Generate content with streaming response
+        
+        Args:
+            prompt: User prompt
+            system_prompt: System instructions
+            coalesce_ms: Batch tokens arriving within this window into one chunk (0 = per token)
+            
+        Yields:
+            Chunks of generated text
+        """
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        
+        yield from self._stream_chat(messages, coalesce_ms)
+    
+    async def agenerate_content(self, prompt: str, system_prompt: str = None,
+                                session: aiohttp.ClientSession = None) -> Optional[str]:
+        """
+        Async variant of generate_content
+        
+        Args:
+            prompt: User prompt
+            system_prompt: System instructions
+            session: aiohttp session to reuse; a temporary one is opened if omitted
             
         Returns:
             Generated text or None if error
         """
+        if session is None:
+            async with self._aio_session() as session:
+                return await self.agenerate_content(prompt, system_prompt, session)
+        
         try:
             messages = []
             if system_prompt:
@@ -70,31 +363,71 @@ class OllamaService:
             payload = {
                 "model": self.model,
                 "messages": messages,
-                "stream": stream
+                "stream": False
             }
             
-            response = requests.post(
-                self.api_chat,
-                headers=self.headers,
-                json=payload,
-                timeout=120
-            )
-            
-            if response.status_code == 200:
-                if stream:
-                    return response.text
-                else:
-                    data = response.json()
-                    return data['choices'][0]['message']['content']
+            async with session.post(self.api_chat, data=orjson.dumps(payload)) as response:
+                if response.status == 200:
+                    return _extract_content(orjson.loads(await response.read()))
             return None
             
         except Exception as e:
             print(f"Error generating content: {e}")
             return None
     
-    def generate_content_stream(self, prompt: str, system_prompt: str = None) -> Generator:
+    async def agenerate_many(self, prompts: List[str], system_prompt: str = None,
+                             concurrency: int = 8) -> List[Optional[str]]:
         """
-        Generate content with streaming response
+        Generate several prompts concurrently over one aiohttp session
+        
+        Args:
+            prompts: User prompts
+            system_prompt: System instructions shared by all prompts
+            concurrency: Maximum requests in flight (keeps under Groq rate limits)
+            
+        Returns:
+            Generated texts (None for failures), in the order of prompts
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with self._aio_session(limit=concurrency) as session:
+            async def run(prompt):
+                async with semaphore:
+                    return await self.agenerate_content(prompt, system_prompt, session)
+            
+            return await asyncio.gather(*(run(prompt) for prompt in prompts))
+    
+    def generate_many(self, prompts: List[str], system_prompt: str = None,
+                      concurrency: int = 8) -> List[Optional[str]]:
+        """Blocking wrapper around agenerate_many for use from Streamlit pages"""
+        return asyncio.run(self.agenerate_many(prompts, system_prompt, concurrency))
+    
+    def _aio_session(self, limit: int = POOL_CONNECTIONS) -> aiohttp.ClientSession:
+        """
+        New aiohttp session with the API headers
+        
+        aiohttp sessions are bound to the event loop that created them, so the
+        async methods open one per call (or per batch) instead of keeping one
+        on this shared instance.
+        """
+        return aiohttp.ClientSession(
+            headers={
+                "Authorization": self.session.headers["Authorization"],
+                "Content-Type": "application/json"
+            },
+            connector=aiohttp.TCPConnector(limit=limit),
+            timeout=aiohttp.ClientTimeout(total=120)
+        )
+    
+    async def agenerate_content_stream(self, prompt: str, system_prompt: str = None) -> AsyncGenerator[str, None]:
+        """
+        Async variant of generate_content_stream
+        
+        Lets several generations share one event loop, e.g. one per content
+        type driven by asyncio.gather, so their network waits overlap. How
+        many can run at once is bounded by the Groq tier's rate limits (not
+        OLLAMA_NUM_PARALLEL, which only applies to a local Ollama server);
+        agenerate_many's concurrency argument is the knob for that.
         
         Args:
             prompt: User prompt
@@ -115,33 +448,26 @@ class OllamaService:
                 "stream": True
             }
             
-            response = requests.post(
-                self.api_chat,
-                headers=self.headers,
-                json=payload,
-                stream=True,
-                timeout=120
-            )
-            
-            if response.status_code == 200:
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            line_text = line.decode('utf-8')
-                            if line_text.startswith('data: '):
-                                line_text = line_text[6:]
-                            if line_text.strip() == '[DONE]':
+            async with self._aio_session() as session:
+                async with session.post(self.api_chat, data=orjson.dumps(payload)) as response:
+                    if response.status == 200:
+                        async for line in response.content:
+                            line = line.strip()
+                            # Blank keep-alives and other SSE fields never hold JSON
+                            if not line.startswith(_SSE_PREFIX):
+                                continue
+                            line = line[6:]
+                            if line == _SSE_DONE:
                                 break
-                            data = json.loads(line_text)
-                            if 'choices' in data and len(data['choices']) > 0:
-                                delta = data['choices'][0].get('delta', {})
-                                if 'content' in delta:
-                                    yield delta['content']
-                        except json.JSONDecodeError:
-                            continue
-                            
+                            try:
+                                content = _extract_delta_content(orjson.loads(line))
+                            except (ValueError, LookupError, TypeError, AttributeError):
+                                continue
+                            if content:
+                                yield content
+                                    
         except Exception as e:
-            print(f"Error in streaming: {e}")
+            print(f"Error in async streaming: {e}")
             yield f"Error: {str(e)}"
     
     def chat_completion(self, messages: List[Dict[str, str]], stream: bool = False) -> Optional[str]:
@@ -155,6 +481,10 @@ class OllamaService:
         Returns:
             Generated response or None if error
         """
+        return self._post_chat(messages, stream)
+    
+    def _post_chat(self, messages: List[Dict[str, str]], stream: bool = False) -> Optional[str]:
+        """Send a chat completion request and return the reply (raw body when stream)"""
         try:
             payload = {
                 "model": self.model,
@@ -162,10 +492,9 @@ class OllamaService:
                 "stream": stream
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.api_chat,
-                headers=self.headers,
-                json=payload,
+                data=orjson.dumps(payload),
                 timeout=120
             )
             
@@ -173,24 +502,37 @@ class OllamaService:
                 if stream:
                     return response.text
                 else:
-                    data = response.json()
-                    return data['choices'][0]['message']['content']
+                    return _extract_content(orjson.loads(response.content))
             return None
             
-        except Exception as e:
+        except (requests.RequestException, ValueError, LookupError) as e:
             print(f"Error in chat completion: {e}")
             return None
     
-    def chat_completion_stream(self, messages: List[Dict[str, str]]) -> Generator:
+    def chat_completion_stream(self, messages: List[Dict[str, str]],
+                               coalesce_ms: float = STREAM_COALESCE_MS) -> Generator:
         """
         Generate chat completion with streaming
         
         Args:
             messages: List of message dicts with 'role' and 'content'
+            coalesce_ms: Batch tokens arriving within this window into one chunk (0 = per token)
             
         Yields:
             Chunks of generated text
         """
+        yield from self._stream_chat(messages, coalesce_ms)
+    
+    def _stream_chat(self, messages: List[Dict[str, str]],
+                     coalesce_ms: float = STREAM_COALESCE_MS) -> Generator:
+        """
+        Stream a chat completion, yielding content deltas as they arrive
+        
+        Tokens are joined into larger chunks (see coalesce_ms); order is kept,
+        only the chunk boundaries change.
+        """
+        parts = []
+        last = time.monotonic()
         try:
             payload = {
                 "model": self.model,
@@ -198,33 +540,43 @@ class OllamaService:
                 "stream": True
             }
             
-            response = requests.post(
+            # Closing the response returns its connection to the pool
+            with self.session.post(
                 self.api_chat,
-                headers=self.headers,
-                json=payload,
+                data=orjson.dumps(payload),
                 stream=True,
                 timeout=120
-            )
-            
-            if response.status_code == 200:
-                for line in response.iter_lines():
-                    if line:
+            ) as response:
+                if response.status_code == 200:
+                    for line in _iter_sse_lines(response):
+                        # Blank keep-alives and other SSE fields never hold JSON,
+                        # so skip them before paying for a parse attempt
+                        if not line.startswith(_SSE_PREFIX):
+                            continue
+                        line = line[6:]
+                        if line == _SSE_DONE:
+                            break
                         try:
-                            line_text = line.decode('utf-8')
-                            if line_text.startswith('data: '):
-                                line_text = line_text[6:]
-                            if line_text.strip() == '[DONE]':
-                                break
-                            data = json.loads(line_text)
-                            if 'choices' in data and len(data['choices']) > 0:
-                                delta = data['choices'][0].get('delta', {})
-                                if 'content' in delta:
-                                    yield delta['content']
-                        except json.JSONDecodeError:
+                            # orjson parses the raw bytes, no decode needed
+                            content = _extract_delta_content(orjson.loads(line))
+                        except (ValueError, LookupError, TypeError, AttributeError):
                             continue
+                        if content:
+                            parts.append(content)
+                            now = time.monotonic()
+                            if len(parts) >= STREAM_COALESCE_TOKENS or (now - last) * 1000 >= coalesce_ms:
+                                yield "".join(parts)
+                                parts.clear()
+                                last = now
+            
+            if parts:
+                yield "".join(parts)
                             
-        except Exception as e:
-            print(f"Error in streaming chat: {e}")
+        # Reading response.raw directly raises urllib3's errors, not requests'
+        except (requests.RequestException, UrllibHTTPError) as e:
+            print(f"Error in streaming: {e}")
+            if parts:
+                yield "".join(parts)
             yield f"Error: {str(e)}"
     
     def create_content_prompt(self, content_type: str, user_prompt: str, 
@@ -241,85 +593,18 @@ class OllamaService:
         Returns:
             Formatted prompt for LLM
         """
-        length_guidelines = {
-            "short": "Keep it concise, around 50-100 words.",
-            "medium": "Make it moderate length, around 150-250 words.",
-            "long": "Create detailed content, around 300-500 words."
-        }
+        template = _PROMPT_TEMPLATES.get(content_type)
+        if template is None:
+            return f"Generate {content_type} content about: {user_prompt}"
         
-        tone_guidelines = {
-            "professional": "Use professional, formal language.",
-            "casual": "Use casual, friendly language.",
-            "creative": "Be creative and engaging.",
-            "persuasive": "Be persuasive and compelling.",
-            "informative": "Be informative and educational."
-        }
-        
-        prompts = {
-            "LinkedIn Post": f"""Create a professional LinkedIn post about: {user_prompt}
-
-Requirements:
-- {tone_guidelines.get(tone, tone_guidelines['professional'])}
-- {length_guidelines.get(length, length_guidelines['medium'])}
-- Include relevant hashtags
-- Make it engaging and valuable for LinkedIn audience
-- Use appropriate formatting with line breaks
+        template, fallback_tone, fallback_length = template
+        return template.format(
+            user_prompt=user_prompt,
+            tone=_TONE_GUIDELINES.get(tone, _TONE_GUIDELINES[fallback_tone]),
+            length=_LENGTH_GUIDELINES.get(length, _LENGTH_GUIDELINES[fallback_length])
+        )
 
-Generate only the post content, no explanations.""",
-            
-            "Professional Email": f"""Write a professional email about: {user_prompt}
-
-Requirements:
-- {tone_guidelines.get(tone, tone_guidelines['professional'])}
-- Include appropriate subject line
-- Proper email structure (greeting, body, closing)
-- {length_guidelines.get(length, length_guidelines['medium'])}
-- Clear and concise communication
-
-Generate only the email content.""",
-            
-            "Ad Content": f"""Create compelling ad copy for: {user_prompt}
-
-Requirements:
-- {tone_guidelines.get(tone, tone_guidelines['persuasive'])}
-- {length_guidelines.get(length, length_guidelines['short'])}
-- Include attention-grabbing headline
-- Focus on benefits and call-to-action
-- Persuasive and engaging
-
-Generate only the ad content.""",
-            
-            "Conversational Text": f"""Generate conversational text about: {user_prompt}
-
-Requirements:
-- {tone_guidelines.get(tone, tone_guidelines['casual'])}
-- {length_guidelines.get(length, length_guidelines['medium'])}
-- Natural, flowing conversation style
-- Engaging and relatable
-
-Generate only the conversational text.""",
-            
-            "Blog Post": f"""Write a blog post about: {user_prompt}
-
-Requirements:
-- {tone_guidelines.get(tone, tone_guidelines['informative'])}
-- {length_guidelines.get(length, length_guidelines['long'])}
-- Include engaging title
-- Well-structured with introduction, body, conclusion
-- Informative and valuable content
-
-Generate only the blog post.""",
-            
-            "Social Media Caption": f"""Create a social media caption for: {user_prompt}
-
-Requirements:
-- {tone_guidelines.get(tone, tone_guidelines['casual'])}
-- {length_guidelines.get(length, length_guidelines['short'])}
-- Engaging and shareable
-- Include relevant hashtags and emojis
-- Platform-appropriate
-
-Generate only the caption."""
-        }
-        
-        return prompts.get(content_type, f"Generate {content_type} content about: {user_prompt}")
+@st.cache_resource
+def get_ollama() -> OllamaService:
+    """Process-wide OllamaService instance shared across reruns and sessions"""
+    return OllamaService()
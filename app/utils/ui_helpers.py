@@ -4,9 +4,8 @@ Streamlit UI Styling and Configuration
 
 import streamlit as st
 
-def apply_custom_css():
-    """Apply custom CSS styling"""
-    st.markdown("""
+# Injected on every rerun: Streamlit drops elements a run doesn't re-emit
+_CUSTOM_CSS = """
         <style>
         /* Main container styling */
         .main {
@@ -176,17 +175,35 @@ def apply_custom_css():
             background: #555;
         }
         </style>
-    """, unsafe_allow_html=True)
+"""
+
+_SUCCESS_HTML = '<div class="success-box">✅ %s</div>'
+_ERROR_HTML = '<div class="error-box">❌ %s</div>'
+_CARD_HTML = '<div class="card">%s</div>'
+
+def apply_custom_css():
+    """Apply custom CSS styling"""
+    st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
 
 def set_page_config():
     """Configure Streamlit page settings"""
     st.set_page_config(
         page_title="AI Content Creator",
-        page_icon="✨",
+        page_icon="🎨",
         layout="wide",
         initial_sidebar_state="expanded"
     )
 
+def bootstrap_ui():
+    """
+    Per-run UI setup for an entry point; call it as the first Streamlit command
+    
+    Both parts are re-sent on every run: each rerun resets the browser tab's
+    title and icon, and drops any element (such as the CSS) it doesn't emit.
+    """
+    set_page_config()
+    apply_custom_css()
+
 def show_header(title: str, subtitle: str = None):
     """Display page header"""
     st.markdown(f"# {title}")
@@ -196,11 +213,11 @@ def show_header(title: str, subtitle: str = None):
 
 def show_success(message: str):
     """Display success message"""
-    st.markdown(f'<div class="success-box">✅ {message}</div>', unsafe_allow_html=True)
+    st.markdown(_SUCCESS_HTML % message, unsafe_allow_html=True)
 
 def show_error(message: str):
     """Display error message"""
-    st.markdown(f'<div class="error-box">❌ {message}</div>', unsafe_allow_html=True)
+    st.markdown(_ERROR_HTML % message, unsafe_allow_html=True)
 
 def show_info(message: str):
     """Display info message"""
@@ -208,4 +225,4 @@ def show_info(message: str):
 
 def create_card(content: str):
     """Create a styled card"""
-    st.markdown(f'<div class="card">{content}</div>', unsafe_allow_html=True)
+    st.markdown(_CARD_HTML % content, unsafe_allow_html=True)
@@ -5,7 +5,7 @@ CREATE TABLE IF NOT EXISTS users (
     id SERIAL PRIMARY KEY,
     email VARCHAR(255) UNIQUE NOT NULL,
     password_hash VARCHAR(256) NOT NULL,
-    salt VARCHAR(64) NOT NULL,
+    salt VARCHAR(64), -- legacy PBKDF2 salt; NULL for Argon2id hashes
     display_name VARCHAR(255),
     profile_picture_url TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -59,6 +59,8 @@ CREATE TABLE IF NOT EXISTS generated_content (
     generated_text TEXT NOT NULL,
     tone VARCHAR(50),
     length_preference VARCHAR(50),
+    prompt_preview VARCHAR(110), -- first 100 chars of prompt, set on insert
+    word_count INTEGER, -- words in generated_text, set on insert
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     is_favorite BOOLEAN DEFAULT FALSE
 );
@@ -76,11 +78,17 @@ CREATE TABLE IF NOT EXISTS user_preferences (
 
 -- Create indexes for better performance
 CREATE INDEX idx_users_email ON users(email);
-CREATE INDEX idx_chat_sessions_user_id ON chat_sessions(user_id);
+CREATE INDEX idx_chat_sessions_user_updated ON chat_sessions(user_id, updated_at DESC);
 CREATE INDEX idx_chat_messages_session_id ON chat_messages(session_id);
-CREATE INDEX idx_generated_content_user_id ON generated_content(user_id);
+CREATE INDEX idx_generated_content_user_created ON generated_content(user_id, created_at DESC);
+CREATE INDEX idx_generated_content_user_fav ON generated_content(user_id) WHERE is_favorite;
 CREATE INDEX idx_generated_content_session_id ON generated_content(session_id);
 
+-- Trigram indexes so history search (ILIKE '%...%') can avoid a full scan
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_generated_content_prompt_trgm ON generated_content USING gin (prompt gin_trgm_ops);
+CREATE INDEX idx_generated_content_text_trgm ON generated_content USING gin (generated_text gin_trgm_ops);
+
 -- Create function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
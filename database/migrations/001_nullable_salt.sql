@@ -0,0 +1,3 @@
+-- Argon2id hashes embed their own salt; the salt column is only kept for
+-- legacy PBKDF2 hashes, which are upgraded on the user's next login.
+ALTER TABLE users ALTER COLUMN salt DROP NOT NULL;
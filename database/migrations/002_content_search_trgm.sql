@@ -0,0 +1,4 @@
+-- Trigram indexes so history search (ILIKE '%...%') can avoid a full scan
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_generated_content_prompt_trgm ON generated_content USING gin (prompt gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_generated_content_text_trgm ON generated_content USING gin (generated_text gin_trgm_ops);
@@ -0,0 +1,7 @@
+-- Composite indexes matching the per-user listings (WHERE user_id = ? ORDER BY ... LIMIT ?).
+-- They cover plain user_id lookups too, so the single-column indexes are dropped.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_generated_content_user_created ON generated_content(user_id, created_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_generated_content_user_fav ON generated_content(user_id) WHERE is_favorite;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chat_sessions_user_updated ON chat_sessions(user_id, updated_at DESC);
+DROP INDEX CONCURRENTLY IF EXISTS idx_generated_content_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_chat_sessions_user_id;
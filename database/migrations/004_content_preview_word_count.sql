@@ -0,0 +1,12 @@
+-- Precomputed list-view fields, written by Database.save_generated_content
+ALTER TABLE generated_content ADD COLUMN IF NOT EXISTS prompt_preview VARCHAR(110);
+ALTER TABLE generated_content ADD COLUMN IF NOT EXISTS word_count INTEGER;
+
+-- Backfill existing rows
+UPDATE generated_content
+SET prompt_preview = CASE WHEN length(prompt) > 100 THEN left(prompt, 100) || '...' ELSE prompt END,
+    word_count = CASE
+        WHEN btrim(generated_text, E' \t\r\n') = '' THEN 0
+        ELSE array_length(regexp_split_to_array(btrim(generated_text, E' \t\r\n'), '\s+'), 1)
+    END
+WHERE prompt_preview IS NULL OR word_count IS NULL;